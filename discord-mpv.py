@@ -1,146 +1,429 @@
 #!/usr/bin/env python3
-import subprocess
 import sys
-import threading
+import signal
 import time
 import os
-import json
 import socket
-from pypresence import Presence
+import selectors
+import functools
+import logging
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# mpv speaks newline-delimited JSON; parse replies straight from bytes
+if orjson:
+    json_loads = orjson.loads
+    
+    def encode_line(obj):
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+else:
+    import json
+    json_loads = json.loads
+    
+    def encode_line(obj):
+        return json.dumps(obj).encode() + b"\n"
 
 CLIENT_ID = "1391414654001217556"  # mpv with pre-uploaded assets
 
+logger = logging.getLogger("discord-mpv")
+
+# Presence art assets and fixed text
+LARGE_IMAGE = "mpv"
+LARGE_TEXT = "Mpv Media Player"
+SMALL_IMAGE = "play"
+SMALL_TEXT = "Playing"
+DEFAULT_DETAILS = "Listening to music"
+ASSETS = {
+    "large_image": LARGE_IMAGE,
+    "large_text": LARGE_TEXT,
+    "small_image": SMALL_IMAGE,
+    "small_text": SMALL_TEXT,
+}
+# Discord rejects presence strings longer than this
+MAX_TEXT_LEN = 128
+
+# Properties fetched on every metadata refresh; metadata holds every tag
+PROPS = ("media-title", "metadata")
+
+# Properties mpv pushes property-change events for
+OBSERVED_PROPS = ("media-title", "metadata")
+# Kept clear of the batch request_ids so their replies are never mistaken
+OBSERVE_REQUEST_ID = 1000
+# Minimum seconds between presence updates while events keep arriving
+UPDATE_DEBOUNCE = 2
+# Seconds to wait for mpv to answer a request
+REPLY_TIMEOUT = 1
+# Lets the IPC socket be created non-blocking without a separate fcntl
+SOCK_NONBLOCK = getattr(socket, "SOCK_NONBLOCK", 0)
+# Reconnect backoff while mpv isn't reachable, in seconds
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30
+# Reconnect backoff while Discord isn't reachable, in seconds
+DISCORD_RETRY_DELAY = 1
+MAX_DISCORD_RETRY_DELAY = 30
+# Initial size of the IPC receive buffer; grows for larger messages
+RECV_BUFFER_SIZE = 8192
+# Number of parsed "Artist - Title" strings to remember
+TITLE_CACHE_SIZE = 32
+# Seconds during which an identical warning is not logged again
+ERROR_REPEAT_INTERVAL = 60
+
+@functools.lru_cache(maxsize=None)
+def encode_get_requests(props):
+    """Encode pipelined get_property commands, request_id = index in props"""
+    return b"".join(
+        encode_line({"command": ["get_property", p], "request_id": i})
+        for i, p in enumerate(props)
+    )
+
+def cap(text):
+    """Truncate text to what Discord accepts, without copying short strings"""
+    return text if len(text) <= MAX_TEXT_LEN else text[:MAX_TEXT_LEN]
+
+# The observe commands never change, so encode them once
+OBSERVE_REQS = b"".join(
+    encode_line({
+        "command": ["observe_property", i + 1, p],
+        "request_id": OBSERVE_REQUEST_ID
+    })
+    for i, p in enumerate(OBSERVED_PROPS)
+)
+
 class MPVDiscordRPC:
     def __init__(self, socket_path):
         self.rpc = None
         self.connected = False
+        # Set after a failed connect so an outage is only reported once
+        self.discord_down = False
+        self.next_retry = 0.0
+        self.discord_backoff = DISCORD_RETRY_DELAY
         self.current_title = ""
         self.current_artist = ""
         self.mpv_socket = socket_path
         self.running = True
+        self.sock = None
+        # Received bytes live in buf[:buf_len]; recv_into fills the tail
+        self.buf = bytearray(RECV_BUFFER_SIZE)
+        self.view = memoryview(self.buf)
+        self.buf_len = 0
+        # One selector waits on both the mpv socket and the stop() pipe
+        self.selector = selectors.DefaultSelector()
+        self._stop_r, self._stop_w = os.pipe()
+        self.selector.register(self._stop_r, selectors.EVENT_READ)
+        self.dirty = False
+        self.last_update = 0.0
+        self.last_err_msg = None
+        self.last_err_time = 0.0
+        self._last_payload = None
+        self._last_raw_title = None
+        self._title_parse_cache = OrderedDict()
+        # Only details/state change between updates; keep the rest prebuilt
+        self._activity = {
+            "details": DEFAULT_DETAILS,
+            "state": "",
+            "assets": ASSETS,
+            "instance": True,
+        }
+        self._payload = {
+            "cmd": "SET_ACTIVITY",
+            "args": {"pid": os.getpid(), "activity": self._activity},
+            "nonce": ""
+        }
         
     def connect_discord(self):
         """Connect to Discord RPC"""
         try:
+            # Imported here so startup doesn't pay for pypresence and asyncio
+            from pypresence import Presence
             self.rpc = Presence(CLIENT_ID)
-            self.rpc.connect()
+            # connect() replaces the event loop Presence() created with a
+            # fresh one, so close the first loop rather than leak its fds
+            first_loop = self.rpc.loop
+            try:
+                self.rpc.connect()
+            finally:
+                if self.rpc.loop is not first_loop:
+                    first_loop.close()
             self.connected = True
-            print("Discord RPC connected")
+            self.discord_down = False
+            self.discord_backoff = DISCORD_RETRY_DELAY
+            logger.info("Discord RPC connected")
         except Exception as e:
-            print(f"Failed to connect to Discord: {e}")
-            self.connected = False
+            if not self.discord_down:
+                self.discord_down = True
+                logger.warning("Failed to connect to Discord: %s", e)
+            self._discord_lost()
     
-    def get_mpv_property(self, property_name):
-        """Get property from mpv via IPC"""
+    def _close_rpc(self):
+        """Close the Discord client and its event loop"""
+        if self.rpc is None:
+            return
         try:
-            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            sock.connect(self.mpv_socket)
+            self.rpc.close()
+        except Exception:
+            pass
+        # close() never reaches its own loop.close() if it fails first, e.g.
+        # on a client that never connected
+        if not self.rpc.loop.is_closed():
+            self.rpc.loop.close()
+        self.rpc = None
+    
+    def _discord_lost(self):
+        """Drop the Discord connection and schedule the next reconnect attempt"""
+        self._close_rpc()
+        self.connected = False
+        self._last_payload = None
+        self.next_retry = time.monotonic() + self.discord_backoff
+        self.discord_backoff = min(self.discord_backoff * 2, MAX_DISCORD_RETRY_DELAY)
+    
+    def _warn(self, msg, *args):
+        """Log a warning unless it just repeats the previous one"""
+        if not logger.isEnabledFor(logging.WARNING):
+            return
+        text = msg % args
+        now = time.monotonic()
+        if text == self.last_err_msg and now - self.last_err_time < ERROR_REPEAT_INTERVAL:
+            return
+        self.last_err_msg = text
+        self.last_err_time = now
+        logger.warning("%s", text)
+    
+    def _ensure_sock(self):
+        """Open the mpv IPC connection if it isn't already open"""
+        if self.sock is None:
+            # All reads go through the selector, so the socket never needs
+            # to block; a unix connect() completes or fails immediately
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | SOCK_NONBLOCK)
+            try:
+                if not SOCK_NONBLOCK:
+                    sock.setblocking(False)
+                sock.connect(self.mpv_socket)
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+            self.buf_len = 0
+            self.selector.register(sock, selectors.EVENT_READ)
+            self._observe()
+        return self.sock
+    
+    def _observe(self):
+        """Ask mpv to push events when the presence-relevant properties change"""
+        self.sock.sendall(OBSERVE_REQS)
+    
+    def _close_sock(self):
+        """Drop the mpv IPC connection so the next call reconnects"""
+        if self.sock is not None:
+            self.selector.unregister(self.sock)
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+        self.buf_len = 0
+    
+    def _wait_readable(self, timeout=None):
+        """Wait for data from mpv; False on timeout or once stop() is called"""
+        ready = self.selector.select(timeout)
+        return self.running and any(key.fileobj is self.sock for key, _ in ready)
+    
+    def _pause(self, delay):
+        """Sleep for delay seconds, waking early if stop() is called"""
+        self.selector.select(delay)
+    
+    def _read_line(self, timeout=None):
+        """Read one newline-terminated message from mpv, None if none arrived in time"""
+        while True:
+            i = self.buf.find(b'\n', 0, self.buf_len)
+            if i >= 0:
+                line = bytes(self.view[:i])
+                # Shift any following messages to the front of the buffer
+                rest = self.buf_len - i - 1
+                self.buf[:rest] = self.buf[i + 1:self.buf_len]
+                self.buf_len = rest
+                return line
             
-            command = {
-                "command": ["get_property", property_name],
-                "request_id": 1
-            }
+            if self.buf_len == len(self.buf):
+                # The message doesn't fit; the view must go before resizing
+                self.view.release()
+                self.buf.extend(bytes(len(self.buf)))
+                self.view = memoryview(self.buf)
             
-            sock.send((json.dumps(command) + '\n').encode())
-            response = sock.recv(4096).decode()
-            sock.close()
+            if not self._wait_readable(timeout):
+                return None
+            n = self.sock.recv_into(self.view[self.buf_len:])
+            if not n:
+                raise ConnectionResetError("mpv closed the IPC connection")
+            self.buf_len += n
+    
+    def _batch_get(self, props):
+        """Get several properties from mpv in a single IPC round-trip"""
+        results = [""] * len(props)
+        try:
+            sock = self._ensure_sock()
+            sock.sendall(encode_get_requests(props))
             
-            data = json.loads(response)
-            if data.get("error") == "success":
-                return data.get("data", "")
-            return ""
-        except Exception as e:
-            print(f"Error getting property {property_name}: {e}")
-            return ""
+            # Replies can interleave with events mpv pushes on this connection
+            pending = set(range(len(props)))
+            while pending:
+                line = self._read_line(REPLY_TIMEOUT)
+                if line is None:
+                    raise socket.timeout("no reply from mpv")
+                data = json_loads(line)
+                i = data.get("request_id")
+                if i not in pending or "event" in data:
+                    continue
+                if data.get("error") == "success":
+                    results[i] = data.get("data", "")
+                pending.discard(i)
+            return results
+        except (OSError, ValueError) as e:
+            self._close_sock()
+            self._warn("Error getting properties from mpv: %s", e)
+            return [""] * len(props)
     
     def update_metadata(self):
         """Update song metadata from mpv"""
-        title = self.get_mpv_property("media-title")
-        if not title:
-            title = self.get_mpv_property("metadata/by-key/Title")
-        if not title:
-            title = self.get_mpv_property("metadata/by-key/title")
+        raw_title, metadata = self._batch_get(PROPS)
+        self._last_raw_title = raw_title
         
-        artist = self.get_mpv_property("metadata/by-key/Artist")
-        if not artist:
-            artist = self.get_mpv_property("metadata/by-key/artist")
-        if not artist:
-            artist = self.get_mpv_property("metadata/by-key/ARTIST")
+        # Tag case varies between sources (Title/title, Artist/ARTIST)
+        tags = {}
+        if isinstance(metadata, dict):
+            tags = {key.lower(): value for key, value in metadata.items()}
+        title = raw_title or tags.get("title")
+        artist = tags.get("artist")
         
         self.current_title = title or "Unknown Title"
         
         if artist and artist.strip():
             self.current_artist = artist.strip()
-        elif " - " in self.current_title:
-            parts = self.current_title.split(" - ", 1)
-            self.current_artist = parts[0].strip()
-            self.current_title = parts[1].strip()
         else:
-            self.current_artist = ""
+            self.current_artist, self.current_title = self._split_title(self.current_title)
+    
+    def _split_title(self, raw_title):
+        """Split "Artist - Title" into (artist, title), memoized per raw title"""
+        cache = self._title_parse_cache
+        parsed = cache.get(raw_title)
+        if parsed is not None:
+            cache.move_to_end(raw_title)
+            return parsed
+        
+        i = raw_title.find(" - ")
+        if i >= 0:
+            parsed = (raw_title[:i].strip(), raw_title[i + 3:].strip())
+        else:
+            parsed = ("", raw_title)
+        
+        cache[raw_title] = parsed
+        if len(cache) > TITLE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return parsed
     
     def update_presence(self):
         """Update Discord presence"""
+        if not self.connected and time.monotonic() >= self.next_retry:
+            self.connect_discord()
         if not self.connected:
+            # Keep the update pending until the next reconnect attempt
+            self.dirty = True
             return
             
         try:
             self.update_metadata()
             
             if self.current_artist:
-                details_text = f"by {self.current_artist}"
-                state_text = self.current_title
+                details_text = cap(f"by {self.current_artist}")
             else:
-                details_text = "Listening to music"
-                state_text = self.current_title
+                details_text = DEFAULT_DETAILS
+            state_text = cap(self.current_title)
             
-            # Truncate if too long
-            details_text = details_text[:128]
-            state_text = state_text[:128]
+            # Nothing visible changed, skip the Discord round-trip
+            payload = (details_text, state_text)
+            if payload == self._last_payload:
+                return
             
-            self.rpc.update(
-                details=details_text,
-                state=state_text,
-                large_image="mpv",
-                large_text="Mpv Media Player",
-                small_image="play",
-                small_text="Playing"
-            )
+            # Same SET_ACTIVITY payload pypresence would build from kwargs
+            self._activity["details"] = details_text
+            self._activity["state"] = state_text
+            self._payload["nonce"] = f"{time.time():.20f}"
+            self.rpc.update(payload_override=self._payload)
+            self._last_payload = payload
         except Exception as e:
-            print(f"Failed to update Discord presence: {e}")
+            self._warn("Failed to update Discord presence: %s", e)
+            self._discord_lost()
+            self.dirty = True
     
     def monitor_mpv(self):
         """Monitor mpv for metadata changes"""
+        delay = RETRY_DELAY
         while self.running:
             try:
-                if not os.path.exists(self.mpv_socket):
-                    time.sleep(2)
-                    continue
-                    
-                self.update_presence()
-                time.sleep(15)
-            except Exception as e:
-                print(f"Monitoring error: {e}")
-                time.sleep(5)
+                # Connecting doubles as the existence check for the socket
+                self._ensure_sock()
+                
+                # Block until mpv pushes something, waking early only to
+                # flush a debounced update or retry Discord
+                timeout = None
+                due = max(self.last_update + UPDATE_DEBOUNCE, self.next_retry)
+                if self.dirty:
+                    timeout = max(0, due - time.monotonic())
+                
+                line = self._read_line(timeout)
+                if line is not None:
+                    data = json_loads(line)
+                    delay = RETRY_DELAY
+                    if data.get("event") == "property-change":
+                        # A media-title we already resolved needs no refetch
+                        if not (data.get("name") == "media-title"
+                                and data.get("data") == self._last_raw_title):
+                            self.dirty = True
+                
+                if self.dirty and time.monotonic() >= due:
+                    self.dirty = False
+                    self.last_update = time.monotonic()
+                    self.update_presence()
+            except (FileNotFoundError, ConnectionRefusedError, BlockingIOError):
+                # mpv hasn't created its socket yet, or its backlog is full
+                self._pause(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+            except (OSError, ValueError) as e:
+                self._warn("Monitoring error: %s", e)
+                self._close_sock()
+                self._pause(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
     
     def stop(self):
-        """Clean up and stop the RPC"""
+        """Ask monitor_mpv to return; safe to call from a signal handler"""
         self.running = False
-        if self.connected and self.rpc:
-            try:
-                self.rpc.close()
-            except:
-                pass
+        # Wake monitor_mpv if it is blocked in the selector
+        try:
+            os.write(self._stop_w, b"\0")
+        except OSError:
+            pass
+    
+    def close(self):
+        """Release the mpv and Discord connections"""
+        self._close_sock()
+        self._close_rpc()
 
 def main(socket_path):
+    logging.basicConfig(level=logging.WARNING, format="%(name)s: %(message)s")
     rpc = MPVDiscordRPC(socket_path)
+    # mpv-tui stops us with terminate(); the stop pipe wakes the selector
+    # so monitor_mpv returns and Discord is closed cleanly
+    signal.signal(signal.SIGTERM, lambda signum, frame: rpc.stop())
     try:
         rpc.connect_discord()
         rpc.monitor_mpv()
     except KeyboardInterrupt:
         pass
     finally:
-        rpc.stop()
+        rpc.close()
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -1,19 +1,38 @@
 #!/usr/bin/env python3
 
 import curses
+import atexit
 import subprocess
 import threading
 import time
 import json
 import os
 import sys
-import signal
-import socket
-import tempfile
-from typing import List, Dict, Optional
-import urllib.parse
-import re
+import queue
+from typing import List, Dict, Optional, Callable
 from pathlib import Path
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON helpers: orjson when installed, stdlib json otherwise. Both parse
+# str or bytes and serialize to UTF-8 bytes.
+if orjson:
+    _loads = orjson.loads
+    
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data)
+else:
+    _loads = json.loads
+    
+    def _dumps(data) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+# Seconds the saver thread waits for more changes before writing
+SAVE_DELAY = 0.5
 
 class HistoryManager:
     def __init__(self):
@@ -25,29 +44,82 @@ class HistoryManager:
         self.history_file = self.config_dir / 'history.json'
         self.liked_file = self.config_dir / 'liked.json'
         
-        # Load existing data
-        self.history = self.load_file(self.history_file)
-        self.liked = self.load_file(self.liked_file)
+        # Load existing data; both lists are keyed by title, oldest first
+        self.history = OrderedDict((t.get('title'), t) for t in self.load_file(self.history_file))
+        self.liked = OrderedDict((t.get('title'), t) for t in self.load_file(self.liked_file))
+        
+        # Most-recent-first views handed to the UI, rebuilt only after changes
+        self._history_rev_cache = None
+        self._liked_rev_cache = None
+        
+        # Saves happen on a background thread so the UI never waits on disk.
+        # The UI thread hands it snapshots, keyed by file, to write out
+        self._pending: Dict[Path, List[Dict]] = {}
+        self._save_cv = threading.Condition()
+        self._write_lock = threading.Lock()
+        threading.Thread(target=self._save_loop, daemon=True).start()
+        atexit.register(self._flush_now)
     
     def load_file(self, file_path: Path) -> List[Dict]:
         """Load JSON data from file"""
         try:
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        return data
-            return []
-        except (json.JSONDecodeError, FileNotFoundError, PermissionError):
+            data = _loads(file_path.read_bytes())
+        except (ValueError, OSError):
+            # Missing, unreadable or corrupt files start out empty
             return []
+        return data if isinstance(data, list) else []
     
     def save_file(self, file_path: Path, data: List[Dict]):
         """Save data to JSON file"""
+        # Encode in one shot and write once, then swap the file into place so
+        # a crash mid-write never leaves a truncated file behind. The data
+        # goes out in a single write, so buffering would only add a copy
+        tmp_path = file_path.with_suffix('.json.tmp')
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except (PermissionError, OSError):
-            pass
+            with open(tmp_path, 'wb', buffering=0) as f:
+                # Unbuffered writes may be short, so write until it's all out
+                view = memoryview(_dumps(data))
+                while view:
+                    view = view[f.write(view):]
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def _mark_dirty(self, name: str):
+        """Invalidate cached views and schedule a save of 'history' or 'liked'"""
+        # Snapshot here, on the thread that mutates the lists, so the saver
+        # never iterates them while they change
+        if name == 'history':
+            self._history_rev_cache = None
+            file_path, data = self.history_file, list(self.history.values())
+        else:
+            self._liked_rev_cache = None
+            file_path, data = self.liked_file, list(self.liked.values())
+        
+        with self._save_cv:
+            self._pending[file_path] = data
+            self._save_cv.notify()
+    
+    def _save_loop(self):
+        """Write dirty files, collapsing bursts of changes into one save"""
+        while True:
+            with self._save_cv:
+                self._save_cv.wait_for(lambda: self._pending)
+            time.sleep(SAVE_DELAY)
+            self._flush_now()
+    
+    def _flush_now(self):
+        """Write any pending changes immediately"""
+        with self._write_lock:
+            with self._save_cv:
+                pending, self._pending = self._pending, {}
+            
+            for file_path, data in pending.items():
+                self.save_file(file_path, data)
     
     def add_track(self, track: Dict, to_history: bool = True, to_liked: bool = False):
         """Add track to history and/or liked songs"""
@@ -55,50 +127,59 @@ class HistoryManager:
         track_with_time['played_at'] = time.time()
         
         if to_history:
-            # Remove if already in history to avoid duplicates
-            self.history = [t for t in self.history if t.get('title') != track['title']]
-            self.history.append(track_with_time)
+            # Re-inserting moves a replayed track to the end without duplicates
+            self.history.pop(track['title'], None)
+            self.history[track['title']] = track_with_time
             if len(self.history) > 100:
-                self.history = self.history[-100:]
-            self.save_file(self.history_file, self.history)
+                self.history.popitem(last=False)
+            self._mark_dirty('history')
         
         if to_liked:
-            # Remove if already in liked to avoid duplicates
-            self.liked = [t for t in self.liked if t.get('title') != track['title']]
-            self.liked.append(track_with_time)
-            self.save_file(self.liked_file, self.liked)
+            # Re-liking moves the track to the end without duplicates
+            self.liked.pop(track['title'], None)
+            self.liked[track['title']] = track_with_time
+            self._mark_dirty('liked')
     
     def remove_liked(self, track: Dict):
         """Remove track from liked songs"""
-        self.liked = [t for t in self.liked if t.get('title') != track.get('title')]
-        self.save_file(self.liked_file, self.liked)
+        if self.liked.pop(track.get('title'), None) is not None:
+            self._mark_dirty('liked')
     
     def clear_history(self):
         """Clear all history"""
         self.history.clear()
-        self.save_file(self.history_file, self.history)
+        self._mark_dirty('history')
     
     def clear_liked(self):
         """Clear all liked songs"""
         self.liked.clear()
-        self.save_file(self.liked_file, self.liked)
+        self._mark_dirty('liked')
     
     def get_history(self) -> List[Dict]:
         """Get history in reverse order (most recent first)"""
-        return list(reversed(self.history))
+        if self._history_rev_cache is None:
+            self._history_rev_cache = list(reversed(self.history.values()))
+        return self._history_rev_cache
     
     def get_liked(self) -> List[Dict]:
         """Get liked songs in reverse order (most recent first)"""
-        return list(reversed(self.liked))
+        if self._liked_rev_cache is None:
+            self._liked_rev_cache = list(reversed(self.liked.values()))
+        return self._liked_rev_cache
+    
+    def get_liked_titles(self):
+        """Get the liked titles as a set-like view, for fast membership checks"""
+        return self.liked.keys()
     
     def is_liked(self, track: Dict) -> bool:
         """Check if a track is liked"""
-        return any(t.get('title') == track.get('title') for t in self.liked)
+        return track.get('title') in self.liked
 
 class YouTubeSearcher:
     @staticmethod
-    def search(query: str, max_results: int = 10) -> List[Dict]:
-        """Search YouTube using yt-dlp"""
+    def search(query: str, max_results: int = 10,
+               on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Search YouTube using yt-dlp, passing each result to on_result as it arrives"""
         try:
             cmd = [
                 'yt-dlp',
@@ -108,24 +189,32 @@ class YouTubeSearcher:
                 f'ytsearch{max_results}:{query}'
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode != 0:
-                return []
+            # yt-dlp prints one JSON line per result; parse the raw bytes as they come
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            timer = threading.Timer(10, proc.kill)
+            timer.start()
             
             videos = []
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    try:
-                        data = json.loads(line)
-                        videos.append({
+            try:
+                for line in proc.stdout:
+                    if line.strip():
+                        try:
+                            data = _loads(line)
+                        except ValueError:
+                            continue
+                        video = {
                             'title': data.get('title', 'Unknown'),
                             'url': data.get('url', ''),
                             'duration': data.get('duration', 0),
                             'uploader': data.get('uploader', 'Unknown')
-                        })
-                    except json.JSONDecodeError:
-                        continue
+                        }
+                        videos.append(video)
+                        if on_result:
+                            on_result(video)
+                proc.wait()
+            finally:
+                timer.cancel()
+                proc.stdout.close()
             
             return videos
         except Exception:
@@ -135,16 +224,26 @@ class MPVPlayer:
     def __init__(self):
         self.process = None
         self.current_track = None
+        # Exact title of the playing track, for matching list rows
+        self.current_title = None
         self.is_playing = False
         self.is_paused = False
         self.ipc_socket = None
         self.rpc_process = None
+        # Persistent IPC connection, opened on the first command
+        self._ipc_sock = None
+        self._ipc_lock = threading.Lock()
+        # Commands go out from a writer thread so bursts share one write
+        self._ipc_queue = queue.SimpleQueue()
+        threading.Thread(target=self._ipc_writer, daemon=True).start()
         
     def play(self, url: str, title: str = ""):
         """Play a YouTube URL using mpv"""
         self.stop()
         
         try:
+            import tempfile
+            
             # Create a unique socket path for IPC
             self.ipc_socket = os.path.join(tempfile.gettempdir(), f"mpv_socket_{os.getpid()}")
             
@@ -168,6 +267,7 @@ class MPVPlayer:
                 url
             ])
             self.current_track = title
+            self.current_title = title
             self.is_playing = True
             self.is_paused = False
             
@@ -175,6 +275,7 @@ class MPVPlayer:
             
         except Exception as e:
             self.current_track = f"Error: {str(e)}"
+            self.current_title = None
             self.is_playing = False
     
     def _monitor_playback(self):
@@ -184,28 +285,101 @@ class MPVPlayer:
             self.is_playing = False
             self.is_paused = False
             self.current_track = None
-            if self.ipc_socket and os.path.exists(self.ipc_socket):
+            self.current_title = None
+            self._close_ipc()
+            if self.ipc_socket:
                 try:
                     os.remove(self.ipc_socket)
-                except:
+                except OSError:
                     pass
     
-    def _send_command(self, command):
-        """Send command to mpv via IPC"""
-        if not self.ipc_socket or not os.path.exists(self.ipc_socket):
-            return False
+    def _connect_ipc(self):
+        """Open the persistent IPC connection to mpv"""
+        import socket
         
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(1.0)
         try:
-            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            sock.settimeout(1.0)
             sock.connect(self.ipc_socket)
-            
-            command_json = json.dumps({"command": command}) + "\n"
-            sock.send(command_json.encode())
+            # Nothing reads this connection, so don't let mpv push events at it
+            sock.sendall(b'{"command":["disable_event","all"]}\n')
+        except OSError:
             sock.close()
-            return True
-        except:
+            raise
+        # Commands are tiny and replies are only drained, so never block on it
+        sock.setblocking(False)
+        self._ipc_sock = sock
+    
+    def _close_ipc(self):
+        """Close the IPC connection, if open"""
+        with self._ipc_lock:
+            if self._ipc_sock:
+                self._ipc_sock.close()
+                self._ipc_sock = None
+    
+    def _send_command(self, command, on_failed: Optional[Callable[[], None]] = None):
+        """Queue command for mpv; False if its IPC socket can't be reached
+        
+        on_failed is called from the writer thread if the command is
+        queued but can't be delivered after all.
+        """
+        if not self.ipc_socket:
             return False
+        
+        # connect() itself reports a missing (FileNotFoundError) or stale
+        # (ConnectionRefusedError) socket file; no separate stat to race against
+        with self._ipc_lock:
+            if self._ipc_sock is None:
+                try:
+                    self._connect_ipc()
+                except OSError:
+                    return False
+        
+        self._ipc_queue.put((_dumps({"command": command}) + b"\n", on_failed))
+        return True
+    
+    def _ipc_writer(self):
+        """Send queued commands, coalescing everything pending into one write"""
+        while True:
+            data, on_failed = self._ipc_queue.get()
+            failure_callbacks = [on_failed] if on_failed else []
+            try:
+                while True:
+                    more, on_failed = self._ipc_queue.get_nowait()
+                    data += more
+                    if on_failed:
+                        failure_callbacks.append(on_failed)
+            except queue.Empty:
+                pass
+            
+            with self._ipc_lock:
+                # Playback stopped since these were queued
+                if self._ipc_sock is None:
+                    continue
+                
+                # A dead connection (mpv restarted) gets one reconnect attempt
+                sent = False
+                for _ in range(2):
+                    try:
+                        if self._ipc_sock is None:
+                            self._connect_ipc()
+                        # Discard replies to earlier commands so the buffer never fills
+                        try:
+                            while self._ipc_sock.recv(4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                        self._ipc_sock.sendall(data)
+                        sent = True
+                        break
+                    except OSError:
+                        if self._ipc_sock:
+                            self._ipc_sock.close()
+                            self._ipc_sock = None
+            
+            if not sent:
+                for callback in failure_callbacks:
+                    callback()
     
     def stop(self):
         """Stop current playback"""
@@ -222,29 +396,39 @@ class MPVPlayer:
         self.is_playing = False
         self.is_paused = False
         self.current_track = None
+        self.current_title = None
+        self._close_ipc()
         
-        if self.ipc_socket and os.path.exists(self.ipc_socket):
+        if self.ipc_socket:
             try:
                 os.remove(self.ipc_socket)
-            except:
+            except OSError:
                 pass
         self.ipc_socket = None
     
     def pause(self):
         """Pause/resume playback"""
         if self.process and self.is_playing:
-            if self._send_command(["cycle", "pause"]):
-                self.is_paused = not self.is_paused
+            paused = not self.is_paused
+            # If mpv never gets the command, pause it with signals instead
+            if self._send_command(["cycle", "pause"], on_failed=lambda: self._signal_pause(paused)):
+                self.is_paused = paused
             else:
-                try:
-                    if self.is_paused:
-                        self.process.send_signal(subprocess.signal.SIGCONT)
-                        self.is_paused = False
-                    else:
-                        self.process.send_signal(subprocess.signal.SIGSTOP)
-                        self.is_paused = True
-                except:
-                    pass
+                self._signal_pause(paused)
+    
+    def _signal_pause(self, paused: bool):
+        """Pause or resume mpv with SIGSTOP/SIGCONT, bypassing IPC"""
+        process = self.process
+        if not process:
+            return
+        try:
+            if paused:
+                process.send_signal(subprocess.signal.SIGSTOP)
+            else:
+                process.send_signal(subprocess.signal.SIGCONT)
+            self.is_paused = paused
+        except:
+            pass
 
 class SpotiTUI:
     def __init__(self, stdscr):
@@ -260,6 +444,20 @@ class SpotiTUI:
         self.input_mode = False
         self.current_view = "search"  # search, history, liked
         
+        # Panels to redraw on the next loop iteration
+        self._dirty = {'header', 'nav', 'search', 'results', 'player'}
+        self._player_state = None
+        
+        # Formatted rows by id(track), reused until the width or liked state
+        # changes; cleared whenever the lists shown are swapped out
+        self._row_cache = {}
+        
+        # Searches run on a worker thread that appends to search_results
+        self._results_lock = threading.Lock()
+        self._results_updated = False
+        self._search_id = 0
+        self.searching_for = None
+        
         # Colors
         curses.start_color()
         curses.init_pair(1, curses.COLOR_GREEN, curses.COLOR_BLACK)  # Spotify green
@@ -296,6 +494,10 @@ class SpotiTUI:
         # Now playing bar
         self.player_win = curses.newwin(3, w, h - 3, 0)
         
+    def mark_dirty(self, *panels):
+        """Schedule panels ('header', 'nav', 'search', 'results', 'player') for redraw"""
+        self._dirty.update(panels)
+    
     def draw_header(self):
         """Draw the header with logo"""
         self.header_win.clear()
@@ -383,15 +585,22 @@ class SpotiTUI:
     
     def draw_search_results(self):
         """Draw search results"""
-        if not self.search_results:
-            self.main_win.addstr(2, 2, "No results. Press '/' to search for music.", curses.color_pair(2))
+        h, w = self.main_win.getmaxyx()
+        with self._results_lock:
+            results = self.search_results[:h-3]
+        
+        if not results:
+            if self.searching_for is not None:
+                self.main_win.addstr(2, 2, f"Searching for '{self.searching_for}'...", curses.color_pair(1))
+            else:
+                self.main_win.addstr(2, 2, "No results. Press '/' to search for music.", curses.color_pair(2))
             return
         
-        h, w = self.main_win.getmaxyx()
         self.main_win.addstr(0, 2, "Search Results:", curses.color_pair(1) | curses.A_BOLD)
         
-        for i, track in enumerate(self.search_results[:h-3]):
-            self.draw_track_item(i, track, i + 2, show_like=True)
+        liked_titles = self.history_manager.get_liked_titles()
+        for i, track in enumerate(results):
+            self.draw_track_item(i, track, i + 2, w, w - 25, liked_titles, show_like=True)
     
     def draw_history(self):
         """Draw listening history"""
@@ -403,15 +612,9 @@ class SpotiTUI:
         h, w = self.main_win.getmaxyx()
         self.main_win.addstr(0, 2, f"Recently Played ({len(history)} tracks):", curses.color_pair(6) | curses.A_BOLD)
         
+        liked_titles = self.history_manager.get_liked_titles()
         for i, track in enumerate(history[:h-3]):
-            if 'played_at' in track:
-                played_time = time.strftime("%m/%d %H:%M", time.localtime(track['played_at']))
-                track_display = track.copy()
-                track_display['uploader'] = f"{track['uploader']} • {played_time}"
-            else:
-                track_display = track
-            
-            self.draw_track_item(i, track_display, i + 2, show_like=True)
+            self.draw_track_item(i, track, i + 2, w, w - 25, liked_titles, show_like=True)
     
     def draw_liked(self):
         """Draw liked songs"""
@@ -424,21 +627,24 @@ class SpotiTUI:
         self.main_win.addstr(0, 2, f"Liked Songs ({len(liked)} tracks):", curses.color_pair(7) | curses.A_BOLD)
         
         for i, track in enumerate(liked[:h-3]):
-            if 'played_at' in track:
-                played_time = time.strftime("%m/%d %H:%M", time.localtime(track['played_at']))
-                track_display = track.copy()
-                track_display['uploader'] = f"{track['uploader']} • {played_time}"
-            else:
-                track_display = track
-            
-            self.draw_track_item(i, track_display, i + 2, show_like=False)
+            self.draw_track_item(i, track, i + 2, w, w - 20, None, show_like=False)
     
-    def draw_track_item(self, index, track, y_pos, show_like=True):
-        """Draw a single track item with optional like button"""
-        h, w = self.main_win.getmaxyx()
+    def draw_track_item(self, index, track, y_pos, w, max_title_width, liked_titles, show_like=True):
+        """Draw a single track item with optional like button
         
-        if y_pos >= h - 1:
-            return
+        Callers fetch the window width, title width and liked-title set once
+        per frame and only pass rows that fit in the window.
+        """
+        is_liked = track.get('title') in liked_titles if show_like else None
+        
+        # Only re-format the row when something it shows has changed
+        key = (w, max_title_width, is_liked)
+        cached = self._row_cache.get(id(track))
+        if cached and cached[0] is track and cached[1] == key:
+            track_info = cached[2]
+        else:
+            track_info = self.format_track_item(track, max_title_width, is_liked)[:w-5]
+            self._row_cache[id(track)] = (track, key, track_info)
         
         # Determine color based on view
         if self.current_view == "liked":
@@ -451,34 +657,40 @@ class SpotiTUI:
         # Highlight selected or playing track
         if index == self.selected_index:
             color = curses.color_pair(3) | curses.A_BOLD
-        elif self.player.current_track and track['title'] in self.player.current_track:
+        elif track['title'] == self.player.current_title:
             color = curses.color_pair(4) | curses.A_BOLD
         else:
             color = base_color
         
+        # Highlight selection
+        if index == self.selected_index:
+            self.main_win.addstr(y_pos, 1, "►", curses.color_pair(1) | curses.A_BOLD)
+        
+        self.main_win.addstr(y_pos, 3, track_info, color)
+    
+    def format_track_item(self, track, max_title_width, is_liked):
+        """Build the text for a track row; is_liked is None to omit the like button"""
         # Format duration
         duration = track.get('duration', 0)
         duration_str = f"{int(duration) // 60:02d}:{int(duration) % 60:02d}" if duration else "??:??"
         
+        # History and liked entries also show when they were played
+        uploader = track['uploader']
+        if 'played_at' in track:
+            played_time = time.strftime("%m/%d %H:%M", time.localtime(track['played_at']))
+            uploader = f"{uploader} • {played_time}"
+        
         # Format track info
-        max_title_width = w - 25 if show_like else w - 20
         title = track['title'][:max_title_width] if len(track['title']) > max_title_width else track['title']
-        uploader = track['uploader'][:15] if len(track['uploader']) > 15 else track['uploader']
+        uploader = uploader[:15] if len(uploader) > 15 else uploader
         
         # Add like indicator if needed
         like_indicator = ""
-        if show_like:
-            is_liked = self.history_manager.is_liked(track)
+        if is_liked is not None:
             like_indicator = " ♥ " if is_liked else " ♡ "
             like_indicator = like_indicator.ljust(4)
         
-        track_info = f"{title} - {uploader} [{duration_str}]{like_indicator}"
-        
-        # Highlight selection
-        if index == self.selected_index:
-            self.main_win.addstr(y_pos, 1, "►", curses.color_pair(1) | curses.A_BOLD)
-        
-        self.main_win.addstr(y_pos, 3, track_info[:w-5], color)
+        return f"{title} - {uploader} [{duration_str}]{like_indicator}"
     
     def draw_player(self):
         """Draw the now playing bar"""
@@ -506,21 +718,30 @@ class SpotiTUI:
         """Search for music"""
         if not query.strip():
             return
-            
-        self.search_results = []
-        self.selected_index = 0
         
-        self.main_win.clear()
-        self.main_win.addstr(2, 2, f"Searching for '{query}'...", curses.color_pair(1))
-        self.main_win.refresh()
+        # A new search id makes any older, still-running search drop its results
+        with self._results_lock:
+            self._search_id += 1
+            self.search_results = []
+        self._row_cache.clear()
+        self.selected_index = 0
+        self.searching_for = query
+        self.mark_dirty('results')
         
-        results = self.searcher.search(query)
-        self.search_results = results
+        threading.Thread(target=self._run_search, args=(query, self._search_id), daemon=True).start()
+    
+    def _run_search(self, query: str, search_id: int):
+        """Run a search on a worker thread, publishing results as they arrive"""
+        def add_result(video):
+            with self._results_lock:
+                if search_id == self._search_id:
+                    self.search_results.append(video)
+            self._results_updated = True
         
-        if not results:
-            self.main_win.clear()
-            self.main_win.addstr(2, 2, "No results found. Try a different search.", curses.color_pair(5))
-            self.main_win.refresh()
+        self.searcher.search(query, on_result=add_result)
+        if search_id == self._search_id:
+            self.searching_for = None
+        self._results_updated = True
     
     def get_current_list(self):
         """Get current track list based on view"""
@@ -549,6 +770,7 @@ class SpotiTUI:
         
         # Play track
         self.player.play(track['url'], track['title'])
+        self.mark_dirty('results', 'player')
     
     def toggle_like(self):
         """Toggle like status for selected track"""
@@ -562,6 +784,7 @@ class SpotiTUI:
             self.history_manager.remove_liked(track)
         else:
             self.history_manager.add_track(track, to_history=False, to_liked=True)
+        self.mark_dirty('results')
     
     def remove_selected_liked(self):
         """Remove currently selected track from liked songs"""
@@ -574,11 +797,19 @@ class SpotiTUI:
         
         track = current_list[self.selected_index]
         self.history_manager.remove_liked(track)
+        self.mark_dirty('results')
         
         # Adjust selection if we removed the last item
         if self.selected_index >= len(self.history_manager.get_liked()):
             self.selected_index = max(0, self.selected_index - 1)
     
+    def switch_view(self, view):
+        """Switch between the search, history and liked views"""
+        self.current_view = view
+        self.selected_index = 0
+        self._row_cache.clear()
+        self.mark_dirty('nav', 'search', 'results')
+    
     def handle_mouse(self, mouse_event):
         """Handle mouse events"""
         _, x, y, _, button_state = mouse_event
@@ -593,8 +824,7 @@ class SpotiTUI:
                 ]
                 for start, end, view in tab_ranges:
                     if start <= x <= end:
-                        self.current_view = view
-                        self.selected_index = 0
+                        self.switch_view(view)
                         return
             
             # Check track list
@@ -603,6 +833,7 @@ class SpotiTUI:
                 current_list = self.get_current_list()
                 if 0 <= track_index < len(current_list):
                     self.selected_index = track_index
+                    self.mark_dirty('results')
                     
                     # Check if clicking on like button (if visible)
                     if self.current_view != "liked" and x >= self.stdscr.getmaxyx()[1] - 5:
@@ -623,31 +854,41 @@ class SpotiTUI:
                     pass
                 return True
             
+            if key == curses.KEY_RESIZE:
+                # Rebuild the windows at the new size and repaint everything
+                self.stdscr.clear()
+                self.stdscr.refresh()
+                self.setup_windows()
+                self.mark_dirty('header', 'nav', 'search', 'results', 'player')
+                return True
+            
             if self.input_mode:
                 if key == ord('\n') or key == curses.KEY_ENTER:
                     self.input_mode = False
                     self.search_music(self.search_query)
+                    self.mark_dirty('search')
                 elif key == 27:  # ESC
                     self.input_mode = False
+                    self.mark_dirty('search')
                 elif key == curses.KEY_BACKSPACE or key == 127:
                     self.search_query = self.search_query[:-1]
+                    self.mark_dirty('search')
                 elif 32 <= key <= 126:
                     self.search_query += chr(key)
+                    self.mark_dirty('search')
             else:
                 if key == ord('q'):
                     return False
                 elif key == ord('/') and self.current_view == "search":
                     self.input_mode = True
                     self.search_query = ""
+                    self.mark_dirty('search')
                 elif key == ord('1'):
-                    self.current_view = "search"
-                    self.selected_index = 0
+                    self.switch_view("search")
                 elif key == ord('2'):
-                    self.current_view = "history"
-                    self.selected_index = 0
+                    self.switch_view("history")
                 elif key == ord('3'):
-                    self.current_view = "liked"
-                    self.selected_index = 0
+                    self.switch_view("liked")
                 elif key == ord('l'):
                     if self.current_view == "liked":
                         self.remove_selected_liked()
@@ -662,14 +903,17 @@ class SpotiTUI:
                     elif self.current_view == "liked":
                         self.history_manager.clear_liked()
                     self.selected_index = 0
+                    self.mark_dirty('results')
                 elif key == curses.KEY_UP:
                     current_list = self.get_current_list()
                     if current_list:
                         self.selected_index = max(0, self.selected_index - 1)
+                        self.mark_dirty('results')
                 elif key == curses.KEY_DOWN:
                     current_list = self.get_current_list()
                     if current_list:
                         self.selected_index = min(len(current_list) - 1, self.selected_index + 1)
+                        self.mark_dirty('results')
                 elif key == ord('\n') or key == curses.KEY_ENTER:
                     self.play_selected()
                 elif key == ord(' '):
@@ -683,14 +927,44 @@ class SpotiTUI:
     
     def run(self):
         """Main application loop"""
-        self.stdscr.timeout(100)
+        # getch() refreshes stdscr, which would blank the panels if it had
+        # never been refreshed before
+        self.stdscr.refresh()
+        input_timeout = None
         
         while True:
-            self.draw_header()
-            self.draw_navigation()
-            self.draw_search_bar()
-            self.draw_results()
-            self.draw_player()
+            # Playback changes come from mpv's monitor thread, so poll them;
+            # the results list also highlights the playing track
+            player_state = (self.player.current_track, self.player.is_playing, self.player.is_paused)
+            if player_state != self._player_state:
+                self._player_state = player_state
+                self.mark_dirty('player', 'results')
+            
+            # The search worker only flags new results; draw them from here
+            if self._results_updated:
+                self._results_updated = False
+                self.mark_dirty('results')
+            
+            if 'header' in self._dirty:
+                self.draw_header()
+            if 'nav' in self._dirty:
+                self.draw_navigation()
+            if 'search' in self._dirty:
+                self.draw_search_bar()
+            if 'results' in self._dirty:
+                self.draw_results()
+            if 'player' in self._dirty:
+                self.draw_player()
+            self._dirty.clear()
+            
+            # Panels redraw only when marked dirty. While mpv or a search is
+            # running, tick to poll their state; otherwise nothing can change
+            # without a key press, so block in getch()
+            busy = self.player.is_playing or self.searching_for is not None or self._results_updated
+            wanted_timeout = 250 if busy else -1
+            if wanted_timeout != input_timeout:
+                input_timeout = wanted_timeout
+                self.stdscr.timeout(input_timeout)
             
             if not self.handle_input():
                 break